@@ -1,10 +1,25 @@
 from flask import Flask, render_template, request, redirect, session, jsonify, abort
 import anthropic
 import requests
+import hashlib
 import os
 import random
+import re
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from operator import itemgetter
+from types import MappingProxyType
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter, Retry
+from urllib.parse import quote_plus, urlencode
+
+try:
+    import orjson            # SIMD-accelerated JSON, ~2-5x faster decode
+except ImportError:
+    orjson = None
 
 # ═══════════════════════════════════════════════
 #   LOAD ENVIRONMENT VARIABLES
@@ -13,12 +28,90 @@ load_dotenv()
 
 app = Flask(__name__)
 app.secret_key = 'moviefinder-secret-key-2024'
+# Match '/api/trending/' as '/api/trending' directly instead of paying
+# a redirect round trip for the trailing slash
+app.url_map.strict_slashes = False
+
+# ═══════════════════════════════════════════════
+#   SERVER-SIDE SESSIONS
+# ═══════════════════════════════════════════════
+# Keep the watchlist out of the signed cookie: the cookie then carries
+# only a session id instead of re-signing the whole movie list on every
+# response. Uses Redis when REDIS_URL is set, local files otherwise.
+try:
+    from flask_session import Session
+    redis_url = os.getenv('REDIS_URL')
+    if redis_url:
+        import redis
+        app.config['SESSION_TYPE']  = 'redis'
+        app.config['SESSION_REDIS'] = redis.from_url(redis_url)
+    else:
+        app.config['SESSION_TYPE'] = 'filesystem'
+    app.config['SESSION_PERMANENT'] = False
+    # msgpack packs the nested watchlist dicts smaller and faster than
+    # the default serializer
+    app.config['SESSION_SERIALIZATION_FORMAT'] = 'msgpack'
+    Session(app)
+except ImportError:
+    pass  # fall back to Flask's signed-cookie sessions
+
+# ═══════════════════════════════════════════════
+#   RESPONSE COMPRESSION
+# ═══════════════════════════════════════════════
+# Rendered pages reach tens of KB of HTML; brotli/gzip cuts that ~70-85%
+try:
+    from flask_compress import Compress
+    app.config['COMPRESS_ALGORITHM'] = ['br', 'gzip']
+    app.config['COMPRESS_MIN_SIZE']  = 512
+    Compress(app)
+except ImportError:
+    pass  # responses ship uncompressed without flask-compress
+
+# ═══════════════════════════════════════════════
+#   ORJSON RESPONSE ENCODING
+# ═══════════════════════════════════════════════
+# TMDB decode already uses orjson; this makes jsonify encode with it too
+if orjson:
+    from flask.json.provider import JSONProvider
+
+    class OrjsonProvider(JSONProvider):
+        def dumps(self, obj, **kwargs):
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+
+        def loads(self, s, **kwargs):
+            return orjson.loads(s)
+
+    app.json = OrjsonProvider(app)
+
+# ═══════════════════════════════════════════════
+#   JINJA BYTECODE CACHE
+# ═══════════════════════════════════════════════
+# Compiled templates persist across worker restarts, so each template's
+# first render loads cached bytecode instead of parsing the source
+try:
+    from jinja2 import FileSystemBytecodeCache
+    _jinja_cache_dir = os.path.join(tempfile.gettempdir(), 'moviefinder_jinja_cache')
+    os.makedirs(_jinja_cache_dir, exist_ok=True)
+    app.jinja_env.bytecode_cache = FileSystemBytecodeCache(_jinja_cache_dir)
+except OSError:
+    pass  # unwritable temp dir — templates just compile per process
 
 TMDB_KEY  = os.getenv('TMDB_API_KEY')
 TMDB_BASE = 'https://api.themoviedb.org/3'
 IMG_BASE  = 'https://image.tmdb.org/t/p/w500'
 IMG_ORIG  = 'https://image.tmdb.org/t/p/original'
 
+# ═══════════════════════════════════════════════
+#   TMDB ENDPOINT URLS — Built Once at Import
+# ═══════════════════════════════════════════════
+# Hoisted so handlers don't rebuild identical strings per request and
+# the response cache sees one canonical key per endpoint
+TRENDING_URL    = f'{TMDB_BASE}/trending/movie/week?api_key={TMDB_KEY}'
+POPULAR_URL     = f'{TMDB_BASE}/movie/popular?api_key={TMDB_KEY}'
+TOP_RATED_URL   = f'{TMDB_BASE}/movie/top_rated?api_key={TMDB_KEY}'
+NOW_PLAYING_URL = f'{TMDB_BASE}/movie/now_playing?api_key={TMDB_KEY}'
+UPCOMING_URL    = f'{TMDB_BASE}/movie/upcoming?api_key={TMDB_KEY}'
+
 # ═══════════════════════════════════════════════
 #   SAFE ANTHROPIC CLIENT INIT
 # ═══════════════════════════════════════════════
@@ -50,6 +143,9 @@ GENRES = {
     'Western':     37,
     'Family':      10751,
 }
+# Read-only view: the warmer, GENRE_URLS and the mood/reverse lookups
+# are all derived from GENRES at import, so nothing may mutate it later
+GENRES = MappingProxyType(GENRES)
 
 # ═══════════════════════════════════════════════
 #   MOOD TO GENRE MAP (for Claude AI mood feature)
@@ -67,6 +163,18 @@ MOOD_GENRES = {
     'angry':     ['Action', 'Thriller', 'Crime'],
 }
 
+# ═══════════════════════════════════════════════
+#   DERIVED GENRE LOOKUPS — Built Once at Import
+# ═══════════════════════════════════════════════
+GENRE_ID_TO_NAME = {v: k for k, v in GENRES.items()}
+
+# Pre-joined '28|12|878'-style strings for the discover with_genres param
+MOOD_GENRE_QS = {
+    mood: '|'.join(str(GENRES[g]) for g in genre_list if g in GENRES)
+    for mood, genre_list in MOOD_GENRES.items()
+}
+
+
 # ═══════════════════════════════════════════════
 #   LANGUAGE MAP
 # ═══════════════════════════════════════════════
@@ -84,36 +192,235 @@ LANGUAGES = {
 }
 
 # ═══════════════════════════════════════════════
-#   HELPER — Safe TMDB Request
+#   HTTP SESSION — Pooled + Keep-Alive
+# ═══════════════════════════════════════════════
+SESSION = requests.Session()
+SESSION.mount('https://', HTTPAdapter(
+    pool_connections=20,
+    pool_maxsize=50,
+    max_retries=Retry(total=2, backoff_factor=0.2, status_forcelist=[502, 503, 504]),
+))
+
+EXECUTOR = ThreadPoolExecutor(max_workers=8)
+
+# Claude calls block a worker for seconds on a cold cache; they get
+# their own pool so they can never queue in front of the sub-millisecond
+# TMDB cache hits the shared EXECUTOR mostly serves
+LLM_EXECUTOR = ThreadPoolExecutor(max_workers=4)
+
+
+# ═══════════════════════════════════════════════
+#   TMDB RESPONSE CACHE — In-Memory with TTL
+# ═══════════════════════════════════════════════
+CACHE_TTL_LIST   = 600      # trending / popular / discover lists
+CACHE_TTL_DETAIL = 86400    # movie / person details (effectively static)
+
+_TMDB_CACHE     = {}        # url -> (expires_at, etag, payload)
+_TMDB_CACHE_MAX = 2048
+_CACHE_LOCK     = threading.Lock()
+_INFLIGHT       = {}        # url -> Event set when the fetch finishes
+
+CACHE_TTL_SEARCH  = 86400   # refined query + results are deterministic
+_SEARCH_CACHE     = {}      # query hash -> (expires_at, refined, movies)
+_SEARCH_CACHE_MAX = 4096
+
+CACHE_TTL_LLM  = 7 * 86400  # same prompt -> same review/fact/bio
+_LLM_CACHE     = {}         # prompt hash -> (expires_at, text)
+_LLM_CACHE_MAX = 2048
+
+
+# ═══════════════════════════════════════════════
+#   HELPER — Safe TMDB Request (cached)
 # ═══════════════════════════════════════════════
-def tmdb_get(url):
+def tmdb_get(url, ttl=CACHE_TTL_LIST):
+    now = time.time()
+    with _CACHE_LOCK:
+        cached = _TMDB_CACHE.get(url)
+    if cached and cached[0] > now:
+        return cached[2]
+
+    # Single-flight: if another thread is already fetching this URL,
+    # wait for it and reuse its result instead of stampeding TMDB
+    with _CACHE_LOCK:
+        done = _INFLIGHT.get(url)
+        if done is None:
+            done = threading.Event()
+            _INFLIGHT[url] = done
+            owner = True
+        else:
+            owner = False
+
+    if not owner:
+        done.wait(timeout=20)
+        with _CACHE_LOCK:
+            cached = _TMDB_CACHE.get(url)
+        return cached[2] if cached else {}
+
     try:
-        resp = requests.get(url, timeout=15)
-        resp.raise_for_status()
-        return resp.json()
-    except requests.exceptions.ConnectionError:
-        return {}
-    except requests.exceptions.Timeout:
-        return {}
-    except requests.exceptions.HTTPError:
-        return {}
-    except Exception:
-        return {}
+        # Expired entry with an ETag: revalidate instead of
+        # re-downloading — TMDB answers 304 when nothing changed
+        headers = {}
+        if cached and cached[1]:
+            headers['If-None-Match'] = cached[1]
+
+        try:
+            resp = SESSION.get(url, timeout=15, headers=headers)
+            if resp.status_code == 304:
+                with _CACHE_LOCK:
+                    _TMDB_CACHE[url] = (now + ttl, cached[1], cached[2])
+                return cached[2]
+            resp.raise_for_status()
+            data = orjson.loads(resp.content) if orjson else resp.json()
+        except requests.exceptions.ConnectionError:
+            return {}
+        except requests.exceptions.Timeout:
+            return {}
+        except requests.exceptions.HTTPError:
+            return {}
+        except Exception:
+            return {}
+
+        if data:
+            with _CACHE_LOCK:
+                if len(_TMDB_CACHE) >= _TMDB_CACHE_MAX:
+                    _TMDB_CACHE.clear()
+                _TMDB_CACHE[url] = (now + ttl, resp.headers.get('ETag'), data)
+        return data
+    finally:
+        with _CACHE_LOCK:
+            _INFLIGHT.pop(url, None)
+        done.set()
+
+
+# ═══════════════════════════════════════════════
+#   HELPER — Parallel TMDB Fetch
+# ═══════════════════════════════════════════════
+# Fan independent URLs out over the shared executor; wall-clock becomes
+# max(RTT) instead of sum(RTT). Results come back in input order.
+def tmdb_get_many(urls, ttl=CACHE_TTL_LIST):
+    futures = [EXECUTOR.submit(tmdb_get, u, ttl) for u in urls]
+    return [f.result() for f in futures]
+
+
+# ═══════════════════════════════════════════════
+#   HELPER — Movie Detail Bundle URL
+# ═══════════════════════════════════════════════
+# Shared by movie_detail and add_watchlist so both hit the same cache
+# entry — adding a movie right after viewing it costs no network call
+def movie_bundle_url(movie_id):
+    return (f'{TMDB_BASE}/movie/{movie_id}?api_key={TMDB_KEY}'
+            f'&append_to_response=credits,keywords,reviews,videos,similar,recommendations')
+
+# Plain detail URL — the one key api_movie, api_review and api_trivia
+# all read, so every JSON consumer shares a single cache entry per movie
+def movie_detail_url(movie_id):
+    return f'{TMDB_BASE}/movie/{movie_id}?api_key={TMDB_KEY}'
+
+
+# ═══════════════════════════════════════════════
+#   HELPER — Prefetch Detail Bundles
+# ═══════════════════════════════════════════════
+# After serving a result list, warm the detail cache for the movies the
+# user is most likely to click next. Cache hits return immediately and
+# single-flight dedupes against live requests, so this only ever adds
+# the handful of fetches that would otherwise happen on the next click.
+# Runs on its own small pool so background warming queues behind itself,
+# never in front of foreground requests on the shared EXECUTOR.
+PREFETCH_EXECUTOR = ThreadPoolExecutor(max_workers=5)
+
+def prefetch_movie_details(movies, limit=8):
+    for m in movies[:limit]:
+        movie_id = m.get('id')
+        if movie_id:
+            # Warm the plain detail key: the API list endpoints' callers
+            # follow up with /api/movie|review|trivia/<id>, which all
+            # read this URL (the page routes use the bundle key instead)
+            PREFETCH_EXECUTOR.submit(tmdb_get, movie_detail_url(movie_id), CACHE_TTL_DETAIL)
+
+
+# ═══════════════════════════════════════════════
+#   HELPER — Genre Discover URL
+# ═══════════════════════════════════════════════
+# urlencode keeps parameters safely escaped and in one canonical order,
+# so the genre route and the cache warmer share cache keys
+def discover_genre_url(genre_id, sort='popularity.desc', page=1, min_votes=100):
+    return f'{TMDB_BASE}/discover/movie?' + urlencode({
+        'api_key':        TMDB_KEY,
+        'with_genres':    genre_id,
+        'sort_by':        sort,
+        'include_adult':  'false',
+        'vote_count.gte': min_votes,
+        'page':           page,
+    })
+
+# The default (page 1, popularity) URL per genre is a closed set, so
+# build it once at import — api_genre and the cache warmer share it
+GENRE_URLS = {name: discover_genre_url(gid) for name, gid in GENRES.items()}
+
+
+# ═══════════════════════════════════════════════
+#   BACKGROUND CACHE WARMER
+# ═══════════════════════════════════════════════
+# The homepage lists and the default genre pages are the same handful
+# of URLs for every visitor. A daemon thread revalidates them just
+# before their TTL lapses, so those routes are always served from the
+# warm cache and TMDB sees a fixed request rate regardless of traffic.
+WARM_URLS = [TRENDING_URL, POPULAR_URL, TOP_RATED_URL, NOW_PLAYING_URL, UPCOMING_URL]
+WARM_URLS += list(GENRE_URLS.values())
+# /random samples pages 1-5 of popular; keep those warm too so the
+# picker never waits on TMDB
+WARM_URLS += [f'{POPULAR_URL}&page={p}' for p in range(2, 6)]
+WARM_INTERVAL = 540          # just under CACHE_TTL_LIST
+
+
+def _warm_hot_urls():
+    while True:
+        for url in WARM_URLS:
+            with _CACHE_LOCK:
+                cached = _TMDB_CACHE.get(url)
+                if cached:
+                    # Expire it so the next line revalidates via ETag
+                    _TMDB_CACHE[url] = (0, cached[1], cached[2])
+            tmdb_get(url)
+        time.sleep(WARM_INTERVAL)
+
+
+if TMDB_KEY:
+    threading.Thread(target=_warm_hot_urls, daemon=True, name='cache-warmer').start()
 
 
 # ═══════════════════════════════════════════════
 #   HELPER — Safe Claude AI Call
 # ═══════════════════════════════════════════════
-def ask_claude(prompt, max_tokens=200):
+def ask_claude(prompt, max_tokens=200, system=None):
     if not claude_client:
         return None
+
+    # Prompts embed their inputs (title, year, rating, ...) verbatim, so
+    # identical pages produce identical prompts — memoize the reply and
+    # skip the multi-second LLM round-trip on repeat views
+    key = hashlib.sha256(f'{system or ""}|{prompt}'.encode()).hexdigest()
+    now = time.time()
+    with _CACHE_LOCK:
+        cached = _LLM_CACHE.get(key)
+    if cached and cached[0] > now:
+        return cached[1]
+
     try:
+        kwargs = {}
+        if system:
+            # Static instructions live in the system block; dynamic data
+            # stays in the user prompt. These prompts are well under
+            # Anthropic's 1024-token cacheable minimum, so no
+            # cache_control marker — _LLM_CACHE handles reuse locally.
+            kwargs['system'] = system
         message = claude_client.messages.create(
             model='claude-opus-4-6',
             max_tokens=max_tokens,
-            messages=[{'role': 'user', 'content': prompt}]
+            messages=[{'role': 'user', 'content': prompt}],
+            **kwargs
         )
-        return message.content[0].text.strip()
+        text = message.content[0].text.strip()
     except anthropic.APIConnectionError:
         return None
     except anthropic.APIStatusError:
@@ -121,94 +428,129 @@ def ask_claude(prompt, max_tokens=200):
     except Exception:
         return None
 
+    if text:
+        with _CACHE_LOCK:
+            if len(_LLM_CACHE) >= _LLM_CACHE_MAX:
+                _LLM_CACHE.clear()
+            _LLM_CACHE[key] = (now + CACHE_TTL_LLM, text)
+    return text
+
 
 # ═══════════════════════════════════════════════
 #   HELPER — Refine Search Query with Claude
 # ═══════════════════════════════════════════════
+REFINE_SYSTEM = (
+    "You convert user movie searches into 2-3 clean keyword search terms "
+    "for the TMDB API. No punctuation. No explanation. Output only the keywords.\n"
+    "Examples:\n"
+    "'that movie with the spinning top dream thing' -> inception\n"
+    "'scary shark film from the 70s' -> jaws\n"
+    "'the one where the boat sinks with leo' -> titanic\n"
+    "'funny animated movie about toys that talk' -> toy story\n"
+    "'space movie matthew mcconaughey black hole' -> interstellar"
+)
+
+# Plain short queries ("Inception", "toy story 3") are already good TMDB
+# input — only fuzzy/descriptive searches need the Claude round-trip
+SIMPLE_QUERY_RE = re.compile(r"[A-Za-z0-9 :'\-]{2,40}")
+
+# Sanity bound for API search input — rejects control characters and
+# absurd lengths before spending an HTTPS round trip on them
+QUERY_RE = re.compile(r'[^\x00-\x1f]{1,100}')
+
 def refine_query_with_claude(query):
-    prompt = (
-        f"The user wants to find a movie. Their search is: '{query}'. "
-        "Reply with ONLY 2-3 clean keyword search terms for TMDB API. "
-        "No punctuation. No explanation. Just the keywords."
-    )
-    refined = ask_claude(prompt, max_tokens=80)
-    return refined if refined else query
+    if len(query.split()) <= 4 and SIMPLE_QUERY_RE.fullmatch(query):
+        return query
+    refined = ask_claude(query, max_tokens=80, system=REFINE_SYSTEM)
+    if not refined:
+        return query
+    # Collapse stray newlines/double spaces from the model reply once
+    return ' '.join(refined.split())
 
 
 # ═══════════════════════════════════════════════
 #   HELPER — Get AI Movie Review
 # ═══════════════════════════════════════════════
+REVIEW_SYSTEM = (
+    "Write a short, engaging 3-sentence review of the movie the user gives you. "
+    "Be honest, witty, and helpful. Don't start with 'I'."
+)
+
 def get_ai_review(title, overview, rating, year):
-    prompt = (
-        f"Write a short, engaging 3-sentence movie review for '{title}' ({year}). "
-        f"TMDB Rating: {rating}/10. Overview: {overview}. "
-        "Be honest, witty, and helpful. Don't start with 'I'."
-    )
-    return ask_claude(prompt, max_tokens=200)
+    prompt = f"'{title}' ({year}). TMDB Rating: {rating}/10. Overview: {overview}"
+    return ask_claude(prompt, max_tokens=200, system=REVIEW_SYSTEM)
 
 
 # ═══════════════════════════════════════════════
 #   HELPER — Get AI Movie Recommendation Reason
 # ═══════════════════════════════════════════════
+REASON_SYSTEM = (
+    "In one sentence, explain why someone should watch the movie the user "
+    "gives you. Be enthusiastic and specific. No filler phrases."
+)
+
 def get_recommendation_reason(title, genre_names, rating):
-    prompt = (
-        f"In one sentence, explain why someone should watch '{title}' "
-        f"(genres: {', '.join(genre_names)}, rating: {rating}/10). "
-        "Be enthusiastic and specific. No filler phrases."
-    )
-    return ask_claude(prompt, max_tokens=80)
+    prompt = f"'{title}' (genres: {', '.join(genre_names)}, rating: {rating}/10)"
+    return ask_claude(prompt, max_tokens=80, system=REASON_SYSTEM)
 
 
 # ═══════════════════════════════════════════════
 #   HELPER — Get AI Mood Recommendation Message
 # ═══════════════════════════════════════════════
+MOOD_SYSTEM = (
+    "The user tells you their mood and the movies we recommended for it. "
+    "Write one warm, fun sentence explaining why these are perfect for their mood."
+)
+
 def get_mood_message(mood, movies):
     titles = ', '.join([m.get('title', '') for m in movies[:5]])
-    prompt = (
-        f"The user is feeling '{mood}'. I recommended these movies: {titles}. "
-        "Write one warm, fun sentence explaining why these are perfect for their mood."
-    )
-    return ask_claude(prompt, max_tokens=100)
+    prompt = f"Mood: '{mood}'. Recommended movies: {titles}."
+    return ask_claude(prompt, max_tokens=100, system=MOOD_SYSTEM)
 
 
 # ═══════════════════════════════════════════════
 #   HELPER — Get AI Fun Fact About Movie
 # ═══════════════════════════════════════════════
+FUN_FACT_SYSTEM = (
+    "Give one short, interesting behind-the-scenes fun fact about the movie "
+    "the user gives you. Keep it to 1-2 sentences. If you don't know a "
+    "specific fact, give a general interesting trivia."
+)
+
 def get_movie_fun_fact(title, year):
-    prompt = (
-        f"Give one short, interesting behind-the-scenes fun fact about the movie '{title}' ({year}). "
-        "Keep it to 1-2 sentences. If you don't know a specific fact, give a general interesting trivia."
-    )
-    return ask_claude(prompt, max_tokens=120)
+    return ask_claude(f"'{title}' ({year})", max_tokens=120, system=FUN_FACT_SYSTEM)
 
 
 # ═══════════════════════════════════════════════
 #   HELPER — Get AI Actor Bio Summary
 # ═══════════════════════════════════════════════
+BIO_SYSTEM = (
+    "Write a 2-sentence engaging bio for the actor/actress the user gives "
+    "you. Make it exciting and highlight their best qualities."
+)
+
 def get_actor_summary(name, known_for):
-    prompt = (
-        f"Write a 2-sentence engaging bio for actor/actress '{name}', "
-        f"known for: {known_for}. Make it exciting and highlight their best qualities."
-    )
-    return ask_claude(prompt, max_tokens=150)
+    prompt = f"'{name}', known for: {known_for}"
+    return ask_claude(prompt, max_tokens=150, system=BIO_SYSTEM)
 
 
 # ═══════════════════════════════════════════════
 #   HELPER — Get AI Trivia Quiz Question
 # ═══════════════════════════════════════════════
+TRIVIA_SYSTEM = (
+    "Create a multiple choice trivia question about the movie the user gives you. "
+    "Format your response EXACTLY like this:\n"
+    "QUESTION: [question text]\n"
+    "A: [option a]\n"
+    "B: [option b]\n"
+    "C: [option c]\n"
+    "D: [option d]\n"
+    "ANSWER: [correct letter]\n"
+    "FACT: [one interesting fact about the answer]"
+)
+
 def get_trivia_question(title, year):
-    prompt = (
-        f"Create a multiple choice trivia question about the movie '{title}' ({year}). "
-        "Format your response EXACTLY like this:\n"
-        "QUESTION: [question text]\n"
-        "A: [option a]\n"
-        "B: [option b]\n"
-        "C: [option c]\n"
-        "D: [option d]\n"
-        "ANSWER: [correct letter]\n"
-        "FACT: [one interesting fact about the answer]"
-    )
-    return ask_claude(prompt, max_tokens=200)
+    return ask_claude(f"'{title}' ({year})", max_tokens=200, system=TRIVIA_SYSTEM)
 
 
 # ═══════════════════════════════════════════════
@@ -245,6 +587,44 @@ def get_year(date_str):
         return 'N/A'
 
 
+# ═══════════════════════════════════════════════
+#   HELPER — Trim Movie Dicts for the Card Grid
+# ═══════════════════════════════════════════════
+# TMDB movie dicts carry ~30 keys; the card templates only read these.
+# Projecting before render_template keeps the template context (and any
+# copies of it) small, and the copies mean templates never touch the
+# dicts held in the response cache.
+CARD_FIELDS = ('id', 'title', 'poster_path', 'backdrop_path',
+               'vote_average', 'release_date', 'overview')
+
+def trim_movie(m):
+    return {k: m.get(k) for k in CARD_FIELDS}
+
+def trim_movies(movies):
+    return [trim_movie(m) for m in movies]
+
+# Crew jobs that count as "writer" on the detail page; a set makes the
+# per-crew-member membership check O(1)
+WRITER_JOBS = {'Writer', 'Screenplay', 'Story'}
+
+
+# ═══════════════════════════════════════════════
+#   HELPER — Watchlist Session Accessors
+# ═══════════════════════════════════════════════
+def get_watchlist_ids():
+    # Return ids as a set so 'in' checks (per movie card, per render)
+    # are O(1) instead of scanning a list
+    return set(session.get('watchlist_ids', []))
+
+
+def get_watchlist_movies():
+    movies = session.get('watchlist_movies', {})
+    if isinstance(movies, list):
+        # Migrate sessions from the old list layout to the dict layout
+        movies = {str(m.get('id')): m for m in movies}
+    return movies
+
+
 # ═══════════════════════════════════════════════
 #   TEMPLATE FILTERS
 # ═══════════════════════════════════════════════
@@ -260,11 +640,14 @@ def money_filter(amount):
 def year_filter(date_str):
     return get_year(date_str)
 
+# Only six star strings exist (0-5 filled), so build them once at
+# import instead of allocating two strings per card render.
+_STARS = {i: '★' * i + '☆' * (5 - i) for i in range(6)}
+
 @app.template_filter('stars')
 def stars_filter(rating):
     try:
-        stars = round(float(rating) / 2)
-        return '★' * stars + '☆' * (5 - stars)
+        return _STARS[round(float(rating) / 2)]
     except Exception:
         return '☆☆☆☆☆'
 
@@ -275,35 +658,52 @@ def stars_filter(rating):
 @app.context_processor
 def inject_globals():
     return {
-        'genres':       GENRES,
-        'languages':    LANGUAGES,
-        'moods':        list(MOOD_GENRES.keys()),
-        'current_year': datetime.now().year,
-        'img_base':     IMG_BASE,
-        'img_orig':     IMG_ORIG,
+        'genres':           GENRES,
+        'genre_id_to_name': GENRE_ID_TO_NAME,
+        'languages':        LANGUAGES,
+        'moods':            list(MOOD_GENRES.keys()),
+        'current_year':     datetime.now().year,
+        'img_base':         IMG_BASE,
+        'img_orig':         IMG_ORIG,
     }
 
 
+# ═══════════════════════════════════════════════
+#   API CACHE HEADERS — ETag + Cache-Control
+# ═══════════════════════════════════════════════
+# The JSON API serves the same TMDB-derived payloads to everyone, so
+# let browsers and any fronting cache hold them briefly and revalidate
+# with If-None-Match — repeat calls become 304s with no body. The
+# watchlist endpoint is per-session and must never be shared-cached.
+@app.after_request
+def add_api_cache_headers(resp):
+    if (request.path.startswith('/api/')
+            and not request.path.startswith('/api/watchlist')
+            and resp.status_code == 200):
+        resp.headers['Cache-Control'] = 'public, max-age=300'
+        resp.add_etag()
+        return resp.make_conditional(request)
+    return resp
+
+
 # ═══════════════════════════════════════════════
 #   HOMEPAGE — Trending + Popular + Top Picks
 # ═══════════════════════════════════════════════
 @app.route('/')
 def index():
     try:
-        trending_url = f'{TMDB_BASE}/trending/movie/week?api_key={TMDB_KEY}'
-        popular_url  = f'{TMDB_BASE}/movie/popular?api_key={TMDB_KEY}'
-        top_url      = f'{TMDB_BASE}/movie/top_rated?api_key={TMDB_KEY}'
-
-        trending_data = tmdb_get(trending_url).get('results', [])
-        popular_data  = tmdb_get(popular_url).get('results', [])
-        top_data      = tmdb_get(top_url).get('results', [])
+        # Three independent lists — fetch them in parallel
+        trending_data, popular_data, top_data = [
+            d.get('results', [])
+            for d in tmdb_get_many((TRENDING_URL, POPULAR_URL, TOP_RATED_URL))
+        ]
 
-        featured  = trending_data[0] if trending_data else None
-        trending  = trending_data[1:13]
-        popular   = popular_data[:8]
-        top_picks = top_data[:6]
+        featured  = trim_movie(trending_data[0]) if trending_data else None
+        trending  = trim_movies(trending_data[1:13])
+        popular   = trim_movies(popular_data[:8])
+        top_picks = trim_movies(top_data[:6])
 
-        watchlist_ids = session.get('watchlist_ids', [])
+        watchlist_ids = get_watchlist_ids()
 
         return render_template('index.html',
                                movies=trending,
@@ -329,22 +729,45 @@ def search():
     if not query:
         return redirect('/')
     try:
-        refined = refine_query_with_claude(query)
-
-        url = (f'{TMDB_BASE}/search/movie?api_key={TMDB_KEY}'
-               f'&query={refined}&include_adult=false')
-        if year:
-            url += f'&year={year}'
-        if lang:
-            url += f'&language={lang}'
+        # Same normalized query + filters -> same Claude refinement and
+        # TMDB results, so cache the whole pair and skip both round-trips
+        cache_key = hashlib.sha256(f'{query.lower()}|{year}|{lang}'.encode()).hexdigest()
+        now       = time.time()
 
-        movies = tmdb_get(url).get('results', [])
+        with _CACHE_LOCK:
+            cached = _SEARCH_CACHE.get(cache_key)
 
-        # Fallback: if Claude refined gives no results use original query
-        if not movies and refined != query:
-            fallback_url = (f'{TMDB_BASE}/search/movie?api_key={TMDB_KEY}'
-                            f'&query={query}&include_adult=false')
-            movies = tmdb_get(fallback_url).get('results', [])
+        if cached and cached[0] > now:
+            refined, movies = cached[1], cached[2]
+        else:
+            refined = refine_query_with_claude(query)
+
+            params = {'api_key': TMDB_KEY, 'query': refined, 'include_adult': 'false'}
+            if year:
+                params['year'] = year
+            if lang:
+                params['language'] = lang
+
+            data   = tmdb_get(f'{TMDB_BASE}/search/movie?{urlencode(params)}')
+            movies = data.get('results', [])
+
+            # Fallback: if Claude refined gives no results use original query
+            if not movies and refined != query:
+                params['query'] = query
+                fallback_url = f'{TMDB_BASE}/search/movie?{urlencode(params)}'
+                data   = tmdb_get(fallback_url)
+                movies = data.get('results', [])
+
+            movies = trim_movies(movies)
+
+            # {} is tmdb_get's failure sentinel (a genuine no-match still
+            # returns {'results': []}) — never pin an outage to this
+            # query for the full search TTL
+            if data:
+                with _CACHE_LOCK:
+                    if len(_SEARCH_CACHE) >= _SEARCH_CACHE_MAX:
+                        _SEARCH_CACHE.clear()
+                    _SEARCH_CACHE[cache_key] = (now + CACHE_TTL_SEARCH, refined, movies)
 
         # Sort results client-side
         if sort == 'vote_average.desc':
@@ -354,7 +777,7 @@ def search():
         elif sort == 'title.asc':
             movies = sorted(movies, key=lambda x: x.get('title', ''))
 
-        watchlist_ids = session.get('watchlist_ids', [])
+        watchlist_ids = get_watchlist_ids()
         return render_template('index.html',
                                movies=movies,
                                featured=None,
@@ -379,15 +802,13 @@ def genre(genre_name):
         page = request.args.get('page', 1, type=int)
         sort = request.args.get('sort', 'popularity.desc')
 
-        url = (f'{TMDB_BASE}/discover/movie?api_key={TMDB_KEY}'
-               f'&with_genres={genre_id}&sort_by={sort}'
-               f'&include_adult=false&vote_count.gte=100&page={page}')
+        url = discover_genre_url(genre_id, sort=sort, page=page)
 
         data        = tmdb_get(url)
-        movies      = data.get('results', [])
+        movies      = trim_movies(data.get('results', []))
         total_pages = min(data.get('total_pages', 1), 10)
 
-        watchlist_ids = session.get('watchlist_ids', [])
+        watchlist_ids = get_watchlist_ids()
         return render_template('index.html',
                                movies=movies,
                                featured=None,
@@ -406,43 +827,55 @@ def genre(genre_name):
 @app.route('/movie/<int:movie_id>')
 def movie_detail(movie_id):
     try:
-        movie_url   = f'{TMDB_BASE}/movie/{movie_id}?api_key={TMDB_KEY}&append_to_response=credits,keywords,reviews'
-        video_url   = f'{TMDB_BASE}/movie/{movie_id}/videos?api_key={TMDB_KEY}'
-        similar_url = f'{TMDB_BASE}/movie/{movie_id}/similar?api_key={TMDB_KEY}'
-        recom_url   = f'{TMDB_BASE}/movie/{movie_id}/recommendations?api_key={TMDB_KEY}'
-
-        movie       = tmdb_get(movie_url)
-        videos      = tmdb_get(video_url).get('results', [])
-        similar     = tmdb_get(similar_url).get('results', [])[:6]
-        recommended = tmdb_get(recom_url).get('results', [])[:6]
-
+        # One bundle call: append_to_response folds credits, keywords,
+        # reviews, videos, similar and recommendations into the detail
+        movie = tmdb_get(movie_bundle_url(movie_id), CACHE_TTL_DETAIL)
         if not movie or 'id' not in movie:
             return render_template('error.html', error='Movie not found.')
 
-        # Trailer and video clips
-        trailer = next(
-            (v for v in videos if v.get('type') == 'Trailer' and v.get('site') == 'YouTube'),
-            None
-        )
-        teaser = None
-        if not trailer:
-            teaser = next(
-                (v for v in videos if v.get('type') == 'Teaser' and v.get('site') == 'YouTube'),
-                None
-            )
-        clips = [v for v in videos if v.get('site') == 'YouTube'][:5]
-
-        # Cast and crew
+        # AI Features — kick both Claude calls off now so they overlap
+        # with the processing below
+        title    = movie.get('title', '')
+        overview = movie.get('overview', '')
+        rating   = movie.get('vote_average', 0)
+        year     = get_year(movie.get('release_date', ''))
+
+        ai_review_future   = LLM_EXECUTOR.submit(get_ai_review, title, overview, rating, year)
+        ai_fun_fact_future = LLM_EXECUTOR.submit(get_movie_fun_fact, title, year)
+
+        videos      = movie.get('videos', {}).get('results', [])
+        similar     = trim_movies(movie.get('similar', {}).get('results', [])[:6])
+        recommended = trim_movies(movie.get('recommendations', {}).get('results', [])[:6])
+
+        # Trailer, teaser and clips in one pass over the video list
+        trailer = teaser = None
+        clips   = []
+        for v in videos:
+            if v.get('site') != 'YouTube':
+                continue
+            vtype = v.get('type')
+            if vtype == 'Trailer' and trailer is None:
+                trailer = v
+            elif vtype == 'Teaser' and teaser is None:
+                teaser = v
+            if len(clips) < 5:
+                clips.append(v)
+        if trailer:
+            teaser = None
+
+        # Cast and crew — director and writers picked in one crew scan
         cast     = []
         director = None
         writers  = []
 
         if 'credits' in movie:
-            cast          = movie['credits'].get('cast', [])[:12]
-            crew          = movie['credits'].get('crew', [])
-            director_list = [c for c in crew if c.get('job') == 'Director']
-            director      = director_list[0] if director_list else None
-            writers       = [c for c in crew if c.get('job') in ['Writer', 'Screenplay', 'Story']][:3]
+            cast = movie['credits'].get('cast', [])[:12]
+            for c in movie['credits'].get('crew', []):
+                job = c.get('job')
+                if director is None and job == 'Director':
+                    director = c
+                elif len(writers) < 3 and job in WRITER_JOBS:
+                    writers.append(c)
 
         # Keywords
         keywords = []
@@ -457,15 +890,6 @@ def movie_detail(movie_id):
         # Genre names for AI
         genre_names = [g['name'] for g in movie.get('genres', [])]
 
-        # AI Features
-        title    = movie.get('title', '')
-        overview = movie.get('overview', '')
-        rating   = movie.get('vote_average', 0)
-        year     = get_year(movie.get('release_date', ''))
-
-        ai_review   = get_ai_review(title, overview, rating, year)
-        ai_fun_fact = get_movie_fun_fact(title, year)
-
         # Production info
         companies        = movie.get('production_companies', [])[:4]
         spoken_languages = movie.get('spoken_languages', [])
@@ -473,9 +897,13 @@ def movie_detail(movie_id):
         # Collection / franchise
         belongs_to_collection = movie.get('belongs_to_collection')
 
-        watchlist_ids = session.get('watchlist_ids', [])
+        watchlist_ids = get_watchlist_ids()
         in_watchlist  = movie_id in watchlist_ids
 
+        # Gather the Claude calls that were running in the background
+        ai_review   = ai_review_future.result()
+        ai_fun_fact = ai_fun_fact_future.result()
+
         return render_template('movie.html',
                                movie=movie,
                                trailer=trailer,
@@ -509,7 +937,7 @@ def movie_detail(movie_id):
 def actor_detail(person_id):
     try:
         person_url = f'{TMDB_BASE}/person/{person_id}?api_key={TMDB_KEY}&append_to_response=movie_credits,images'
-        person     = tmdb_get(person_url)
+        person     = tmdb_get(person_url, CACHE_TTL_DETAIL)
 
         if not person or 'id' not in person:
             return render_template('error.html', error='Person not found.')
@@ -520,17 +948,21 @@ def actor_detail(person_id):
             reverse=True
         )[:20]
 
+        # Start the Claude bio while we process the rest of the credits
+        known_for_titles = ', '.join([m.get('title', '') for m in movies[:3]])
+        ai_bio_future    = LLM_EXECUTOR.submit(get_actor_summary,
+                                               person.get('name', ''), known_for_titles)
+
         directed = sorted(
             [m for m in person.get('movie_credits', {}).get('crew', []) if m.get('job') == 'Director'],
             key=lambda x: x.get('popularity', 0),
             reverse=True
         )[:10]
 
-        images           = person.get('images', {}).get('profiles', [])[:8]
-        known_for_titles = ', '.join([m.get('title', '') for m in movies[:3]])
-        ai_bio           = get_actor_summary(person.get('name', ''), known_for_titles)
+        images = person.get('images', {}).get('profiles', [])[:8]
+        ai_bio = ai_bio_future.result()
 
-        watchlist_ids = session.get('watchlist_ids', [])
+        watchlist_ids = get_watchlist_ids()
         return render_template('actor.html',
                                person=person,
                                movies=movies,
@@ -548,7 +980,7 @@ def actor_detail(person_id):
 # ═══════════════════════════════════════════════
 @app.route('/mood')
 def mood_page():
-    watchlist_ids = session.get('watchlist_ids', [])
+    watchlist_ids = get_watchlist_ids()
     return render_template('mood.html',
                            moods=list(MOOD_GENRES.keys()),
                            watchlist_ids=watchlist_ids,
@@ -561,21 +993,22 @@ def mood_page():
 @app.route('/mood/<mood_name>')
 def mood_movies(mood_name):
     try:
-        mood_name  = mood_name.lower()
-        genre_list = MOOD_GENRES.get(mood_name, ['Action'])
-        genre_ids  = [str(GENRES.get(g, '')) for g in genre_list if g in GENRES]
-        genre_str  = '|'.join(genre_ids)
+        mood_name = mood_name.lower()
+        genre_str = MOOD_GENRE_QS.get(mood_name, str(GENRES['Action']))
 
-        url = (f'{TMDB_BASE}/discover/movie?api_key={TMDB_KEY}'
-               f'&with_genres={genre_str}&sort_by=popularity.desc'
-               f'&include_adult=false&vote_count.gte=200')
+        url = f'{TMDB_BASE}/discover/movie?' + urlencode({
+            'api_key':        TMDB_KEY,
+            'with_genres':    genre_str,
+            'sort_by':        'popularity.desc',
+            'include_adult':  'false',
+            'vote_count.gte': 200,
+        })
 
-        movies = tmdb_get(url).get('results', [])
-        random.shuffle(movies)
-        movies = movies[:12]
+        movies = trim_movies(tmdb_get(url).get('results', []))
+        movies = random.sample(movies, min(12, len(movies)))
 
         mood_message  = get_mood_message(mood_name, movies)
-        watchlist_ids = session.get('watchlist_ids', [])
+        watchlist_ids = get_watchlist_ids()
 
         return render_template('index.html',
                                movies=movies,
@@ -598,13 +1031,16 @@ def language_movies(lang_name):
         if not lang_code:
             return redirect('/')
 
-        url = (f'{TMDB_BASE}/discover/movie?api_key={TMDB_KEY}'
-               f'&with_original_language={lang_code}'
-               f'&sort_by=popularity.desc&include_adult=false'
-               f'&vote_count.gte=100')
+        url = f'{TMDB_BASE}/discover/movie?' + urlencode({
+            'api_key':                TMDB_KEY,
+            'with_original_language': lang_code,
+            'sort_by':                'popularity.desc',
+            'include_adult':          'false',
+            'vote_count.gte':         100,
+        })
 
-        movies        = tmdb_get(url).get('results', [])
-        watchlist_ids = session.get('watchlist_ids', [])
+        movies        = trim_movies(tmdb_get(url).get('results', []))
+        watchlist_ids = get_watchlist_ids()
 
         return render_template('index.html',
                                movies=movies,
@@ -622,12 +1058,12 @@ def language_movies(lang_name):
 def top_rated():
     try:
         page        = request.args.get('page', 1, type=int)
-        url         = f'{TMDB_BASE}/movie/top_rated?api_key={TMDB_KEY}&page={page}'
+        url         = f'{TOP_RATED_URL}&page={page}'
         data        = tmdb_get(url)
-        movies      = data.get('results', [])
+        movies      = trim_movies(data.get('results', []))
         total_pages = min(data.get('total_pages', 1), 10)
 
-        watchlist_ids = session.get('watchlist_ids', [])
+        watchlist_ids = get_watchlist_ids()
         return render_template('index.html',
                                movies=movies,
                                featured=None,
@@ -646,12 +1082,12 @@ def top_rated():
 def now_playing():
     try:
         page        = request.args.get('page', 1, type=int)
-        url         = f'{TMDB_BASE}/movie/now_playing?api_key={TMDB_KEY}&page={page}'
+        url         = f'{NOW_PLAYING_URL}&page={page}'
         data        = tmdb_get(url)
-        movies      = data.get('results', [])
+        movies      = trim_movies(data.get('results', []))
         total_pages = min(data.get('total_pages', 1), 5)
 
-        watchlist_ids = session.get('watchlist_ids', [])
+        watchlist_ids = get_watchlist_ids()
         return render_template('index.html',
                                movies=movies,
                                featured=None,
@@ -670,12 +1106,12 @@ def now_playing():
 def upcoming():
     try:
         page        = request.args.get('page', 1, type=int)
-        url         = f'{TMDB_BASE}/movie/upcoming?api_key={TMDB_KEY}&page={page}'
+        url         = f'{UPCOMING_URL}&page={page}'
         data        = tmdb_get(url)
-        movies      = data.get('results', [])
+        movies      = trim_movies(data.get('results', []))
         total_pages = min(data.get('total_pages', 1), 5)
 
-        watchlist_ids = session.get('watchlist_ids', [])
+        watchlist_ids = get_watchlist_ids()
         return render_template('index.html',
                                movies=movies,
                                featured=None,
@@ -694,12 +1130,12 @@ def upcoming():
 def popular():
     try:
         page        = request.args.get('page', 1, type=int)
-        url         = f'{TMDB_BASE}/movie/popular?api_key={TMDB_KEY}&page={page}'
+        url         = f'{POPULAR_URL}&page={page}'
         data        = tmdb_get(url)
-        movies      = data.get('results', [])
+        movies      = trim_movies(data.get('results', []))
         total_pages = min(data.get('total_pages', 1), 10)
 
-        watchlist_ids = session.get('watchlist_ids', [])
+        watchlist_ids = get_watchlist_ids()
         return render_template('index.html',
                                movies=movies,
                                featured=None,
@@ -724,14 +1160,17 @@ def decade_movies(decade):
         start_year = decade
         end_year   = decade + 9
 
-        url = (f'{TMDB_BASE}/discover/movie?api_key={TMDB_KEY}'
-               f'&primary_release_date.gte={start_year}-01-01'
-               f'&primary_release_date.lte={end_year}-12-31'
-               f'&sort_by=popularity.desc&include_adult=false'
-               f'&vote_count.gte=100')
+        url = f'{TMDB_BASE}/discover/movie?' + urlencode({
+            'api_key':                  TMDB_KEY,
+            'primary_release_date.gte': f'{start_year}-01-01',
+            'primary_release_date.lte': f'{end_year}-12-31',
+            'sort_by':                  'popularity.desc',
+            'include_adult':            'false',
+            'vote_count.gte':           100,
+        })
 
-        movies        = tmdb_get(url).get('results', [])
-        watchlist_ids = session.get('watchlist_ids', [])
+        movies        = trim_movies(tmdb_get(url).get('results', []))
+        watchlist_ids = get_watchlist_ids()
 
         return render_template('index.html',
                                movies=movies,
@@ -749,17 +1188,17 @@ def decade_movies(decade):
 def collection(collection_id):
     try:
         url        = f'{TMDB_BASE}/collection/{collection_id}?api_key={TMDB_KEY}'
-        col_data   = tmdb_get(url)
+        col_data   = tmdb_get(url, CACHE_TTL_DETAIL)
 
         if not col_data or 'id' not in col_data:
             return redirect('/')
 
         movies = sorted(
-            col_data.get('parts', []),
+            trim_movies(col_data.get('parts', [])),
             key=lambda x: x.get('release_date', ''),
         )
 
-        watchlist_ids = session.get('watchlist_ids', [])
+        watchlist_ids = get_watchlist_ids()
         return render_template('index.html',
                                movies=movies,
                                featured=None,
@@ -774,25 +1213,30 @@ def collection(collection_id):
 # ═══════════════════════════════════════════════
 @app.route('/watchlist/add/<int:movie_id>')
 def add_watchlist(movie_id):
-    if 'watchlist_ids' not in session:
-        session['watchlist_ids']    = []
-        session['watchlist_movies'] = []
+    ids    = get_watchlist_ids()
+    movies = get_watchlist_movies()
 
-    if movie_id not in session['watchlist_ids']:
-        url   = f'{TMDB_BASE}/movie/{movie_id}?api_key={TMDB_KEY}'
-        movie = tmdb_get(url)
+    if movie_id not in ids:
+        # Usually a pure cache hit: viewing the detail page (or a prior
+        # add) already stored this exact bundle URL
+        movie = tmdb_get(movie_bundle_url(movie_id), CACHE_TTL_DETAIL)
 
         if movie and 'id' in movie:
-            session['watchlist_ids'].append(movie_id)
-            session['watchlist_movies'].append({
+            ids.add(movie_id)
+            # Keyed by str(id): session serialization stringifies keys anyway
+            # Sort fields normalized here so the watchlist sorts can use
+            # plain itemgetter without per-item default handling
+            movies[str(movie_id)] = {
                 'id':           movie.get('id'),
-                'title':        movie.get('title'),
+                'title':        movie.get('title') or '',
                 'poster_path':  movie.get('poster_path'),
-                'vote_average': movie.get('vote_average'),
-                'release_date': movie.get('release_date', ''),
-                'overview':     movie.get('overview', ''),
+                'vote_average': movie.get('vote_average') or 0,
+                'release_date': movie.get('release_date') or '',
+                'overview':     movie.get('overview') or '',
                 'genre_ids':    [g['id'] for g in movie.get('genres', [])],
-            })
+            }
+            session['watchlist_ids']    = list(ids)
+            session['watchlist_movies'] = movies
             session.modified = True
 
     return redirect(request.referrer or '/')
@@ -803,34 +1247,38 @@ def add_watchlist(movie_id):
 # ═══════════════════════════════════════════════
 @app.route('/watchlist/remove/<int:movie_id>')
 def remove_watchlist(movie_id):
-    if 'watchlist_ids' in session:
-        ids    = session.get('watchlist_ids', [])
-        movies = session.get('watchlist_movies', [])
-        if movie_id in ids:
-            idx = ids.index(movie_id)
-            ids.pop(idx)
-            movies.pop(idx)
-            session['watchlist_ids']    = ids
-            session['watchlist_movies'] = movies
-            session.modified = True
+    ids = get_watchlist_ids()
+    if movie_id in ids:
+        movies = get_watchlist_movies()
+        ids.discard(movie_id)
+        movies.pop(str(movie_id), None)
+        session['watchlist_ids']    = list(ids)
+        session['watchlist_movies'] = movies
+        session.modified = True
     return redirect(request.referrer or '/')
 
 
 # ═══════════════════════════════════════════════
 #   WATCHLIST — View Page with Sort
 # ═══════════════════════════════════════════════
+# itemgetter beats a lambda in the sort's inner loop; the fields are
+# normalized at insert time so no per-item defaulting is needed
+WATCHLIST_SORTS = {
+    'rating': (itemgetter('vote_average'), True),
+    'title':  (itemgetter('title'),        False),
+    'year':   (itemgetter('release_date'), True),
+}
+
 @app.route('/watchlist')
 def watchlist():
-    movies        = session.get('watchlist_movies', [])
-    watchlist_ids = session.get('watchlist_ids', [])
+    movies        = list(get_watchlist_movies().values())
+    watchlist_ids = get_watchlist_ids()
     sort          = request.args.get('sort', 'added')
 
-    if sort == 'rating':
-        movies = sorted(movies, key=lambda x: x.get('vote_average', 0), reverse=True)
-    elif sort == 'title':
-        movies = sorted(movies, key=lambda x: x.get('title', ''))
-    elif sort == 'year':
-        movies = sorted(movies, key=lambda x: x.get('release_date', ''), reverse=True)
+    order = WATCHLIST_SORTS.get(sort)
+    if order:
+        key, reverse = order
+        movies = sorted(movies, key=key, reverse=reverse)
 
     return render_template('watchlist.html',
                            movies=movies,
@@ -845,7 +1293,7 @@ def watchlist():
 @app.route('/watchlist/clear')
 def clear_watchlist():
     session['watchlist_ids']    = []
-    session['watchlist_movies'] = []
+    session['watchlist_movies'] = {}
     session.modified = True
     return redirect('/watchlist')
 
@@ -855,7 +1303,7 @@ def clear_watchlist():
 # ═══════════════════════════════════════════════
 @app.route('/api/watchlist')
 def api_watchlist():
-    movies = session.get('watchlist_movies', [])
+    movies = list(get_watchlist_movies().values())
     return jsonify({'count': len(movies), 'movies': movies})
 
 
@@ -864,8 +1312,7 @@ def api_watchlist():
 # ═══════════════════════════════════════════════
 @app.route('/api/movie/<int:movie_id>')
 def api_movie(movie_id):
-    url   = f'{TMDB_BASE}/movie/{movie_id}?api_key={TMDB_KEY}'
-    movie = tmdb_get(url)
+    movie = tmdb_get(movie_detail_url(movie_id), CACHE_TTL_DETAIL)
     if not movie or 'id' not in movie:
         return jsonify({'error': 'Movie not found'}), 404
     return jsonify(movie)
@@ -879,8 +1326,12 @@ def api_search():
     query = request.args.get('q', '').strip()
     if not query:
         return jsonify({'error': 'No query provided'}), 400
-    url    = f'{TMDB_BASE}/search/movie?api_key={TMDB_KEY}&query={query}&include_adult=false'
+    if not QUERY_RE.fullmatch(query):
+        return jsonify({'error': 'Invalid query'}), 400
+    url    = (f'{TMDB_BASE}/search/movie?api_key={TMDB_KEY}'
+              f'&query={quote_plus(query)}&include_adult=false')
     movies = tmdb_get(url).get('results', [])
+    prefetch_movie_details(movies)
     return jsonify({'query': query, 'count': len(movies), 'results': movies})
 
 
@@ -889,8 +1340,7 @@ def api_search():
 # ═══════════════════════════════════════════════
 @app.route('/api/review/<int:movie_id>')
 def api_review(movie_id):
-    url   = f'{TMDB_BASE}/movie/{movie_id}?api_key={TMDB_KEY}'
-    movie = tmdb_get(url)
+    movie = tmdb_get(movie_detail_url(movie_id), CACHE_TTL_DETAIL)
     if not movie or 'id' not in movie:
         return jsonify({'error': 'Movie not found'}), 404
     title    = movie.get('title', '')
@@ -906,8 +1356,7 @@ def api_review(movie_id):
 # ═══════════════════════════════════════════════
 @app.route('/api/trivia/<int:movie_id>')
 def api_trivia(movie_id):
-    url   = f'{TMDB_BASE}/movie/{movie_id}?api_key={TMDB_KEY}'
-    movie = tmdb_get(url)
+    movie = tmdb_get(movie_detail_url(movie_id), CACHE_TTL_DETAIL)
     if not movie or 'id' not in movie:
         return jsonify({'error': 'Movie not found'}), 404
     title  = movie.get('title', '')
@@ -921,8 +1370,8 @@ def api_trivia(movie_id):
 # ═══════════════════════════════════════════════
 @app.route('/api/trending')
 def api_trending():
-    url    = f'{TMDB_BASE}/trending/movie/week?api_key={TMDB_KEY}'
-    movies = tmdb_get(url).get('results', [])
+    movies = tmdb_get(TRENDING_URL).get('results', [])
+    prefetch_movie_details(movies)
     return jsonify({'count': len(movies), 'results': movies})
 
 
@@ -952,7 +1401,7 @@ def api_similar(movie_id):
 @app.route('/api/actor/<int:person_id>')
 def api_actor(person_id):
     url    = f'{TMDB_BASE}/person/{person_id}?api_key={TMDB_KEY}&append_to_response=movie_credits'
-    person = tmdb_get(url)
+    person = tmdb_get(url, CACHE_TTL_DETAIL)
     if not person or 'id' not in person:
         return jsonify({'error': 'Person not found'}), 404
     return jsonify(person)
@@ -963,13 +1412,11 @@ def api_actor(person_id):
 # ═══════════════════════════════════════════════
 @app.route('/api/genre/<genre_name>')
 def api_genre(genre_name):
-    genre_id = GENRES.get(genre_name)
-    if not genre_id:
+    url = GENRE_URLS.get(genre_name)
+    if not url:
         return jsonify({'error': 'Genre not found'}), 404
-    url    = (f'{TMDB_BASE}/discover/movie?api_key={TMDB_KEY}'
-              f'&with_genres={genre_id}&sort_by=popularity.desc'
-              f'&include_adult=false&vote_count.gte=100')
     movies = tmdb_get(url).get('results', [])
+    prefetch_movie_details(movies)
     return jsonify({'genre': genre_name, 'count': len(movies), 'results': movies})
 
 
@@ -979,8 +1426,7 @@ def api_genre(genre_name):
 @app.route('/trivia')
 def trivia_page():
     try:
-        url    = f'{TMDB_BASE}/movie/popular?api_key={TMDB_KEY}'
-        movies = tmdb_get(url).get('results', [])
+        movies = tmdb_get(POPULAR_URL).get('results', [])
 
         if not movies:
             return render_template('error.html', error='Could not load trivia.')
@@ -990,7 +1436,7 @@ def trivia_page():
         year   = get_year(movie.get('release_date', ''))
         trivia = get_trivia_question(title, year)
 
-        watchlist_ids = session.get('watchlist_ids', [])
+        watchlist_ids = get_watchlist_ids()
         return render_template('trivia.html',
                                movie=movie,
                                trivia=trivia,
@@ -1010,12 +1456,10 @@ def random_movie():
         page       = random.randint(1, 5)
 
         if genre_name and genre_name in GENRES:
-            genre_id = GENRES[genre_name]
-            url = (f'{TMDB_BASE}/discover/movie?api_key={TMDB_KEY}'
-                   f'&with_genres={genre_id}&sort_by=popularity.desc'
-                   f'&include_adult=false&vote_count.gte=200&page={page}')
+            url = discover_genre_url(GENRES[genre_name], page=page, min_votes=200)
         else:
-            url = f'{TMDB_BASE}/movie/popular?api_key={TMDB_KEY}&page={page}'
+            # page 1 uses the bare URL so it shares the warmed cache key
+            url = POPULAR_URL if page == 1 else f'{POPULAR_URL}&page={page}'
 
         movies = tmdb_get(url).get('results', [])
         if not movies:
@@ -1032,7 +1476,7 @@ def random_movie():
 # ═══════════════════════════════════════════════
 @app.route('/about')
 def about():
-    watchlist_ids = session.get('watchlist_ids', [])
+    watchlist_ids = get_watchlist_ids()
     return render_template('about.html',
                            watchlist_ids=watchlist_ids,
                            page_title='About MovieProfix')
@@ -1041,10 +1485,13 @@ def about():
 # ═══════════════════════════════════════════════
 #   TEST ROUTE — DELETE AFTER FIXING
 # ═══════════════════════════════════════════════
+# Diagnostics only — hidden unless DEBUG_TEST is set so it can't be
+# used to burn the TMDB quota (and it leaks a key prefix)
 @app.route('/test')
 def test():
-    url = f'{TMDB_BASE}/trending/movie/week?api_key={TMDB_KEY}'
-    data = tmdb_get(url)
+    if not os.environ.get('DEBUG_TEST'):
+        abort(404)
+    data = tmdb_get(TRENDING_URL)
     movies = data.get('results', [])
     return jsonify({
         'tmdb_key_set': bool(TMDB_KEY),
@@ -1075,4 +1522,6 @@ def server_error(e):
 # ═══════════════════════════════════════════════
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 10000))
-    app.run(host='0.0.0.0', port=port, debug=False)
\ No newline at end of file
+    # threaded=True lets the dev server overlap TMDB/Claude waits across
+    # requests instead of serializing them on one thread
+    app.run(host='0.0.0.0', port=port, debug=False, threaded=True)
\ No newline at end of file
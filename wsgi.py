@@ -0,0 +1,11 @@
+# ═══════════════════════════════════════════════
+#   WSGI ENTRY POINT — for gunicorn
+# ═══════════════════════════════════════════════
+# Run with:
+#   gunicorn -k gthread -w 2 --threads 8 -b 0.0.0.0:$PORT wsgi:app
+# Threaded workers multiplex the I/O-bound TMDB/Claude waits without
+# stalling other requests.
+from app import app
+
+if __name__ == '__main__':
+    app.run()